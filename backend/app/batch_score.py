@@ -0,0 +1,215 @@
+"""
+Offline batch scoring of historical match states.
+
+Reads CSV or Parquet files in chunks, encodes each chunk with the same feature
+logic as /api/live-match/predict and streams the predictions to an output file.
+
+The encoded inputs are bit-identical to the online endpoint. The model itself
+runs in float32 and Keras may accumulate differently for different batch
+sizes, so win probabilities agree with the endpoint to within
+WIN_PROB_TOLERANCE rather than bit for bit. Use --verify N to score the first
+N rows both ways and fail if they disagree beyond that.
+
+Usage:
+    python -m app.batch_score states.csv predictions.csv --chunksize 50000 --workers 4 --verify 1000
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    pa = None
+    pq = None
+    PARQUET_AVAILABLE = False
+
+DEFAULT_CHUNKSIZE = 50000
+DEFAULT_BATCH_SIZE = 4096
+# Largest accepted difference between batch and online win probabilities
+WIN_PROB_TOLERANCE = 1e-5
+
+
+def _is_parquet(path: str):
+    return os.path.splitext(path)[1].lower() in ('.parquet', '.pq')
+
+
+def read_chunks(path: str, chunksize: int):
+    """Yields DataFrames of at most chunksize rows from a CSV or Parquet file."""
+    if _is_parquet(path):
+        if not PARQUET_AVAILABLE:
+            raise RuntimeError("pyarrow is required to read Parquet files.")
+        chunks = (batch.to_pandas() for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize))
+    else:
+        chunks = pd.read_csv(path, chunksize=chunksize)
+    for chunk in chunks:
+        chunk.columns = [str(c).strip() for c in chunk.columns]
+        yield chunk
+
+
+class ChunkWriter:
+    """Appends scored chunks to a CSV or Parquet file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.parquet = _is_parquet(path)
+        if self.parquet and not PARQUET_AVAILABLE:
+            raise RuntimeError("pyarrow is required to write Parquet files.")
+        self._writer = None
+        self._schema = None
+        self._header = True
+
+    def write(self, df: pd.DataFrame):
+        if self.parquet:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                # CSV chunks infer dtypes independently, an integer column in one
+                # chunk can be float in the next once it has a missing value, so
+                # integers are widened to float64 and every chunk is cast to that
+                self._schema = pa.schema([
+                    f.with_type(pa.float64()) if pa.types.is_integer(f.type) or pa.types.is_null(f.type) else f
+                    for f in table.schema
+                ])
+                self._writer = pq.ParquetWriter(self.path, self._schema)
+            self._writer.write_table(table.cast(self._schema))
+        else:
+            df.to_csv(self.path, mode='w' if self._header else 'a', header=self._header, index=False)
+            self._header = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def score_chunk(chunk: pd.DataFrame, batch_size: int = DEFAULT_BATCH_SIZE):
+    """Scores one chunk and returns it with the prediction columns appended."""
+    # Imported lazily so every worker process loads the model once on first use
+    from app.services.ml_models import predict_innings_scores_batch, SCORE_INPUT_COLS
+
+    missing = [c for c in SCORE_INPUT_COLS if c not in chunk.columns]
+    if missing:
+        raise ValueError(f"Missing columns in input: {missing}")
+    preds = predict_innings_scores_batch(chunk, batch_size=batch_size)
+    return pd.concat([chunk, preds], axis=1)
+
+
+def verify_against_online(input_path: str, rows: int = 1000, batch_size: int = DEFAULT_BATCH_SIZE,
+                          tolerance: float = WIN_PROB_TOLERANCE):
+    """
+    Scores the first rows of input_path through both predict_innings_score
+    (the online path) and the batch path and compares the outputs.
+    Returns:
+        dict: {rows, max_win_prob_diff, score_mismatches, certainty_mismatches, ok}
+    """
+    from app.services.ml_models import predict_innings_score, predict_innings_scores_batch
+
+    chunk = next(read_chunks(input_path, rows), None)
+    if chunk is None or chunk.empty:
+        return {'rows': 0, 'max_win_prob_diff': 0.0, 'score_mismatches': 0,
+                'certainty_mismatches': 0, 'ok': True}
+    batch = predict_innings_scores_batch(chunk, batch_size=batch_size)
+
+    max_diff = 0.0
+    score_mismatches = 0
+    certainty_mismatches = 0
+    for features, expected in zip(chunk.to_dict('records'), batch.itertuples(index=False)):
+        # The endpoint receives None rather than NaN for a missing target
+        if 'target' in features and pd.isna(features['target']):
+            features['target'] = None
+        predicted_score, win_probability, certainty, _ = predict_innings_score(features)
+        max_diff = max(max_diff, abs(win_probability - expected.win_probability_team1))
+        score_mismatches += int(predicted_score != expected.predicted_score)
+        certainty_mismatches += int(certainty != expected.certainty)
+    return {
+        'rows': len(chunk),
+        'max_win_prob_diff': max_diff,
+        'score_mismatches': score_mismatches,
+        'certainty_mismatches': certainty_mismatches,
+        'ok': max_diff <= tolerance and score_mismatches == 0 and certainty_mismatches == 0,
+    }
+
+
+def run(input_path: str, output_path: str, chunksize: int = DEFAULT_CHUNKSIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE, workers: int = 1):
+    """
+    Streams input_path through the score model into output_path.
+    At most 2 * workers chunks are in flight at a time, so memory stays bounded
+    regardless of input size. Output rows keep the input order.
+    Returns:
+        dict: {rows, seconds, rows_per_second}
+    """
+    writer = ChunkWriter(output_path)
+    rows = 0
+    start = time.perf_counter()
+    try:
+        if workers <= 1:
+            for chunk in read_chunks(input_path, chunksize):
+                scored = score_chunk(chunk, batch_size)
+                writer.write(scored)
+                rows += len(scored)
+        else:
+            # Spawned rather than forked: the parent may already have TensorFlow
+            # running (--verify), and each worker should load its own model
+            with ProcessPoolExecutor(max_workers=workers,
+                                     mp_context=multiprocessing.get_context('spawn')) as pool:
+                pending = deque()
+                for chunk in read_chunks(input_path, chunksize):
+                    pending.append(pool.submit(score_chunk, chunk, batch_size))
+                    if len(pending) >= 2 * workers:
+                        scored = pending.popleft().result()
+                        writer.write(scored)
+                        rows += len(scored)
+                while pending:
+                    scored = pending.popleft().result()
+                    writer.write(scored)
+                    rows += len(scored)
+    finally:
+        writer.close()
+    seconds = time.perf_counter() - start
+    return {
+        'rows': rows,
+        'seconds': round(seconds, 3),
+        'rows_per_second': round(rows / seconds, 1) if seconds > 0 else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch score historical match states.")
+    parser.add_argument('input', help="CSV or Parquet file of match states")
+    parser.add_argument('output', help="CSV or Parquet file to write predictions to")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+                        help="Rows read and encoded per chunk")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Rows per model forward pass")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Number of scoring processes")
+    parser.add_argument('--verify', type=int, default=0, metavar='N',
+                        help="Compare the first N rows against the online scoring path before running")
+    args = parser.parse_args(argv)
+
+    if args.verify > 0:
+        check = verify_against_online(args.input, args.verify, args.batch_size)
+        print(f"Verified {check['rows']} rows against the online path: "
+              f"max win probability diff {check['max_win_prob_diff']:.3g}, "
+              f"{check['score_mismatches']} score and "
+              f"{check['certainty_mismatches']} certainty mismatches", file=sys.stderr)
+        if not check['ok']:
+            print("Batch outputs differ from the online endpoint, aborting.", file=sys.stderr)
+            return 1
+
+    stats = run(args.input, args.output, args.chunksize, args.batch_size, args.workers)
+    print(f"Scored {stats['rows']} rows in {stats['seconds']}s "
+          f"({stats['rows_per_second']} rows/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,17 +3,19 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
+# Load environment variables before the route modules read their configuration
+load_dotenv()
+
 from app.routes import (
     live_match,
     player_performance,
     player_stats,
     clustering,
     fantasy,
+    match_winner,
+    admin,
 )
 
-# Load environment variables
-load_dotenv()
-
 # Configuration
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
 CORS_ORIGINS = os.getenv(
@@ -63,6 +65,16 @@ app.include_router(
     prefix="/api/fantasy",
     tags=["Fantasy"],
 )
+app.include_router(
+    match_winner.router,
+    prefix="/api/match-winner",
+    tags=["Match Winner"],
+)
+app.include_router(
+    admin.router,
+    prefix="/api/admin",
+    tags=["Admin"],
+)
 
 
 @app.get("/health", tags=["Health"])
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, Optional
 
 class MatchConditions(BaseModel):
     venue: str
@@ -23,4 +23,23 @@ class LiveMatchOutput(BaseModel):
     win_probability_team1: float
     win_probability_team2: float
     certainty: str
-    input_used: dict 
\ No newline at end of file
+    input_used: dict
+
+class MatchWinnerInput(BaseModel):
+    team1: str
+    team2: str
+    venue: str
+    toss_winner: str
+    toss_decision: str
+
+class MatchWinnerOutput(BaseModel):
+    predicted_winner: str
+    confidence: float
+    team_probabilities: Dict[str, float]
+    features_used: dict
+
+class MatchResultInput(BaseModel):
+    team1: str
+    team2: str
+    venue: str
+    winner: str
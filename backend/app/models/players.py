@@ -1,8 +1,19 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
 
 class PlayerBase(BaseModel):
     id: int
     name: str
     team: str
-    role: str 
\ No newline at end of file
+    role: str
+
+class BatterClusterUpdate(BaseModel):
+    player: str
+    strike_rate: float = Field(ge=0, allow_inf_nan=False)
+    fours: float = Field(alias="4s", ge=0, allow_inf_nan=False)
+    sixes: float = Field(alias="6s", ge=0, allow_inf_nan=False)
+
+class BowlerClusterUpdate(BaseModel):
+    player: str
+    economy: float = Field(ge=0, allow_inf_nan=False)
+    wickets: float = Field(ge=0, allow_inf_nan=False)
@@ -0,0 +1,41 @@
+import hmac
+import os
+from fastapi import APIRouter, Depends, HTTPException, Header, Query
+from typing import Optional
+from app.services.model_registry import model_registry
+
+router = APIRouter()
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    # Admin endpoints stay disabled until ADMIN_TOKEN is configured
+    admin_token = os.getenv("ADMIN_TOKEN")
+    if not admin_token:
+        raise HTTPException(status_code=503, detail="Admin endpoints are disabled, ADMIN_TOKEN is not set")
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token.encode(), admin_token.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@router.get("/models", dependencies=[Depends(require_admin)])
+def get_model_status():
+    return {"models": model_registry.status()}
+
+@router.get("/models/{name}", dependencies=[Depends(require_admin)])
+def get_single_model_status(name: str):
+    if name not in model_registry.slots:
+        raise HTTPException(status_code=404, detail="Model not found")
+    return model_registry.slot(name).status()
+
+@router.post("/models/{name}/reload", status_code=202, dependencies=[Depends(require_admin)])
+def reload_model(
+    name: str,
+    shadow_requests: int = Query(0, ge=0, le=10000),
+    shadow_timeout: float = Query(60.0, gt=0, le=600),
+    max_shadow_errors: int = Query(0, ge=0),
+    max_drift: Optional[float] = Query(None, ge=0),
+    force: bool = False,
+):
+    if name not in model_registry.slots:
+        raise HTTPException(status_code=404, detail="Model not found")
+    started = model_registry.reload(
+        name, shadow_requests, shadow_timeout, force, max_shadow_errors, max_drift
+    )
+    return {"started": started, "status": model_registry.slot(name).status()}
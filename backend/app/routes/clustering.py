@@ -1,7 +1,13 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List
 import pandas as pd
 import os
 
+from app.routes.admin import require_admin
+from app.models.players import BatterClusterUpdate, BowlerClusterUpdate
+from app.services.player_clusters import load_cluster_model, BATTER_FEATURES, BOWLER_FEATURES
+from app.services.similarity import build_batter_index, build_bowler_index, MAX_NEIGHBOURS
+
 router = APIRouter()
 
 # Load cluster data at startup
@@ -9,73 +15,140 @@ DATA_DIR = os.path.join(os.path.dirname(__file__), '../services/data')
 batter_clusters_path = os.path.join(DATA_DIR, 'batter_clusters.csv')
 bowler_clusters_path = os.path.join(DATA_DIR, 'bowler_clusters.csv')
 
-batter_df = pd.read_csv(batter_clusters_path)
-batter_df.columns = [c.strip() for c in batter_df.columns]
-print("Batter columns:", batter_df.columns.tolist())
+SNAPSHOT_DIR = os.getenv('CLUSTER_SNAPSHOT_DIR', DATA_DIR)
+batter_snapshot_path = os.path.join(SNAPSHOT_DIR, 'batter_clusters_snapshot.npz')
+bowler_snapshot_path = os.path.join(SNAPSHOT_DIR, 'bowler_clusters_snapshot.npz')
+
+# Online cluster models, restored from the latest snapshot when there is one
+batter_clusters = load_cluster_model(batter_clusters_path, batter_snapshot_path, BATTER_FEATURES)
+bowler_clusters = load_cluster_model(bowler_clusters_path, bowler_snapshot_path, BOWLER_FEATURES)
+
+batter_stats_df = pd.read_csv(os.path.join(DATA_DIR, 'batter_stats.csv'))
+batter_stats_df.columns = [c.strip() for c in batter_stats_df.columns]
+
+# Prebuild nearest-neighbour indexes so similarity requests are lookups only
+def _build_batter_indexes():
+    global batter_index, batter_stats_index
+    batter_df = batter_clusters.to_frame()
+    batter_index = build_batter_index(batter_df)
+    batter_stats_index = build_batter_index(batter_df, batter_stats_df)
+
+def _build_bowler_index():
+    global bowler_index
+    bowler_index = build_bowler_index(bowler_clusters.to_frame())
 
-bowler_df = pd.read_csv(bowler_clusters_path)
-bowler_df.columns = [c.strip() for c in bowler_df.columns]
-print("Bowler columns:", bowler_df.columns.tolist())
+_build_batter_indexes()
+_build_bowler_index()
+
+def _cluster_summaries(model):
+    return [
+        {
+            'cluster_label': c['cluster_label'],
+            'members': c['members'],
+            **{f'avg_{col}': avg for col, avg in c['averages'].items()},
+            'count': c['count'],
+        }
+        for c in model.summary()
+    ]
 
 @router.get('/batters')
 def get_batter_clusters():
-    clusters = []
-    for label, group in batter_df.groupby('cluster_label'):
-        members = group['player'].tolist()
-        avg_strike_rate = round(group['strike_rate'].mean(), 2)
-        avg_4s = round(group['4s'].mean(), 2)
-        avg_6s = round(group['6s'].mean(), 2)
-        clusters.append({
-            'cluster_label': label,
-            'members': members,
-            'avg_strike_rate': avg_strike_rate,
-            'avg_4s': avg_4s,
-            'avg_6s': avg_6s,
-            'count': len(members)
-        })
-    return {'clusters': clusters}
+    return {'clusters': _cluster_summaries(batter_clusters)}
 
 @router.get('/batters/{player}')
 def get_batter_cluster_for_player(player: str):
-    row = batter_df[batter_df['player'].str.lower() == player.lower()]
-    if row.empty:
+    r = batter_clusters.get_player(player)
+    if r is None:
         raise HTTPException(status_code=404, detail='Batter not found')
-    r = row.iloc[0]
+    f = r['features']
     return {
         'player': r['player'],
-        'cluster': int(r['cluster']),
+        'cluster': r['cluster'],
         'cluster_label': r['cluster_label'],
-        'strike_rate': round(float(r['strike_rate']), 2),
-        '4s': int(r['4s']),
-        '6s': int(r['6s'])
+        'strike_rate': round(float(f['strike_rate']), 2),
+        '4s': int(f['4s']),
+        '6s': int(f['6s'])
     }
 
 @router.get('/bowlers')
 def get_bowler_clusters():
-    clusters = []
-    for label, group in bowler_df.groupby('cluster_label'):
-        members = group['player'].tolist()
-        avg_economy = round(group['economy'].mean(), 2)
-        avg_wickets = round(group['wickets'].mean(), 2)
-        clusters.append({
-            'cluster_label': label,
-            'members': members,
-            'avg_economy': avg_economy,
-            'avg_wickets': avg_wickets,
-            'count': len(members)
-        })
-    return {'clusters': clusters}
+    return {'clusters': _cluster_summaries(bowler_clusters)}
 
 @router.get('/bowlers/{player}')
 def get_bowler_cluster_for_player(player: str):
-    row = bowler_df[bowler_df['player'].str.lower() == player.lower()]
-    if row.empty:
+    r = bowler_clusters.get_player(player)
+    if r is None:
         raise HTTPException(status_code=404, detail='Bowler not found')
-    r = row.iloc[0]
+    f = r['features']
     return {
         'player': r['player'],
-        'cluster': int(r['cluster']),
+        'cluster': r['cluster'],
         'cluster_label': r['cluster_label'],
-        'economy': round(float(r['economy']), 2),
-        'wickets': int(r['wickets'])
-    } 
\ No newline at end of file
+        'economy': round(float(f['economy']), 2),
+        'wickets': int(f['wickets'])
+    }
+
+@router.post('/batters/update', dependencies=[Depends(require_admin)])
+def update_batters(players: List[BatterClusterUpdate]):
+    updated = [
+        batter_clusters.update(p.player, {'strike_rate': p.strike_rate, '4s': p.fours, '6s': p.sixes})
+        for p in players
+    ]
+    batter_clusters.save(batter_snapshot_path)
+    _build_batter_indexes()
+    return {'updated': updated}
+
+@router.post('/bowlers/update', dependencies=[Depends(require_admin)])
+def update_bowlers(players: List[BowlerClusterUpdate]):
+    updated = [
+        bowler_clusters.update(p.player, {'economy': p.economy, 'wickets': p.wickets})
+        for p in players
+    ]
+    bowler_clusters.save(bowler_snapshot_path)
+    _build_bowler_index()
+    return {'updated': updated}
+
+@router.post('/batters/recluster', dependencies=[Depends(require_admin)])
+def recluster_batters():
+    result = batter_clusters.recluster()
+    batter_clusters.save(batter_snapshot_path)
+    _build_batter_indexes()
+    return {**result, 'clusters': len(batter_clusters.summary())}
+
+@router.post('/bowlers/recluster', dependencies=[Depends(require_admin)])
+def recluster_bowlers():
+    result = bowler_clusters.recluster()
+    bowler_clusters.save(bowler_snapshot_path)
+    _build_bowler_index()
+    return {**result, 'clusters': len(bowler_clusters.summary())}
+
+@router.get('/batters/{player}/similar')
+def get_similar_batters(
+    player: str,
+    k: int = Query(5, ge=1, le=MAX_NEIGHBOURS),
+    with_stats: bool = False,
+):
+    index = batter_stats_index if with_stats else batter_index
+    if player not in index:
+        raise HTTPException(status_code=404, detail='Batter not found')
+    name, similar = index.query(player, k)
+    return {'player': name, 'features': index.feature_cols, 'similar': similar}
+
+@router.get('/bowlers/{player}/similar')
+def get_similar_bowlers(player: str, k: int = Query(5, ge=1, le=MAX_NEIGHBOURS)):
+    if player not in bowler_index:
+        raise HTTPException(status_code=404, detail='Bowler not found')
+    name, similar = bowler_index.query(player, k)
+    return {'player': name, 'features': bowler_index.feature_cols, 'similar': similar}
+
+@router.get('/similar/batters')
+def export_similar_batters(
+    k: int = Query(5, ge=1, le=MAX_NEIGHBOURS),
+    with_stats: bool = False,
+):
+    index = batter_stats_index if with_stats else batter_index
+    return {'k': k, 'features': index.feature_cols, 'players': index.all_pairs(k)}
+
+@router.get('/similar/bowlers')
+def export_similar_bowlers(k: int = Query(5, ge=1, le=MAX_NEIGHBOURS)):
+    return {'k': k, 'features': bowler_index.feature_cols, 'players': bowler_index.all_pairs(k)}
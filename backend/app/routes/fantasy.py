@@ -1,4 +1,4 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Optional
 from fastapi.responses import JSONResponse
@@ -6,6 +6,8 @@ import csv
 import os
 import joblib
 
+from app.services.model_registry import model_registry
+
 router = APIRouter()
 
 # Load fantasy model and player summary at module load
@@ -15,8 +17,15 @@ MODEL_DIR = os.path.join(
 FANTASY_MODEL_PATH = os.path.join(MODEL_DIR, "fantasy_model.pkl")
 FANTASY_SUMMARY_PATH = os.path.join(MODEL_DIR, "fantasy_player_summary.pkl")
 
-fantasy_model = joblib.load(FANTASY_MODEL_PATH)
-player_summary = joblib.load(FANTASY_SUMMARY_PATH)
+def _load_fantasy_model():
+    return {
+        'model': joblib.load(FANTASY_MODEL_PATH),
+        'player_summary': joblib.load(FANTASY_SUMMARY_PATH),
+    }
+
+model_registry.register(
+    'fantasy', _load_fantasy_model, [FANTASY_MODEL_PATH, FANTASY_SUMMARY_PATH]
+)
 
 FANTASY_FEATURES = [
     'batsman_runs', 'wickets_taken', 'caught', 'stumped', 'run_out'
@@ -45,17 +54,24 @@ class FantasyEstimateOutput(BaseModel):
 
 @router.post("/estimate", response_model=FantasyEstimateOutput)
 def estimate_fantasy_points(input: FantasyEstimateInput):
+    def _base_points(bundle):
+        if bundle is None:
+            raise HTTPException(status_code=503, detail="Fantasy model not loaded")
+        player_summary = bundle['player_summary']
+        preds = []
+        for player in input.players:
+            row = player_summary[player_summary['player_name'] == player.name]
+            preds.append(None if row.empty else bundle['model'].predict(row[FANTASY_FEATURES])[0])
+        return preds
+
     team_points = 0
     captain_bonus = 0
     vice_captain_bonus = 0
     individual_preds = []
-    for player in input.players:
-        row = player_summary[player_summary['player_name'] == player.name]
-        if row.empty:
+    for player, base_points in zip(input.players, model_registry.run('fantasy', _base_points)):
+        if base_points is None:
             points = 0
         else:
-            input_data = row[FANTASY_FEATURES]
-            base_points = fantasy_model.predict(input_data)[0]
             if player.captain:
                 points = round(base_points * 1.5)
                 captain_bonus += round(base_points * 0.5)
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException
 from app.models.matches import LiveMatchInput, LiveMatchOutput
-from app.services.ml_models import predict_innings_score, score_model, score_scaler
+from app.services.ml_models import predict_innings_score
+from app.services.model_registry import model_registry
 
 router = APIRouter()
 
@@ -21,7 +22,8 @@ def predict_live_match(input: LiveMatchInput):
 
 @router.get("/model-health")
 def model_health():
+    bundle = model_registry.get("score")
     return {
-        "score_model_loaded": score_model is not None,
-        "score_scaler_loaded": score_scaler is not None
+        "score_model_loaded": bundle is not None and bundle["model"] is not None,
+        "score_scaler_loaded": bundle is not None and bundle["scaler"] is not None
     } 
\ No newline at end of file
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, HTTPException
+from typing import List
+from app.routes.admin import require_admin
+from app.models.matches import MatchWinnerInput, MatchWinnerOutput, MatchResultInput
+from app.services.feature_store import (
+    get_feature_store, predict_match_winner_from_store, record_match_results
+)
+
+router = APIRouter()
+
+@router.post("/predict", response_model=MatchWinnerOutput)
+def predict_winner(input: MatchWinnerInput):
+    try:
+        return predict_match_winner_from_store(**input.dict())
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/results", dependencies=[Depends(require_admin)])
+def record_results(results: List[MatchResultInput]):
+    try:
+        total = record_match_results([(r.team1, r.team2, r.venue, r.winner) for r in results])
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"recorded": len(results), "total_matches": total}
+
+@router.get("/features")
+def get_match_features(team1: str, team2: str, venue: str):
+    feature_store = get_feature_store()
+    if feature_store is None:
+        raise HTTPException(status_code=503, detail="Feature store not loaded")
+    try:
+        return feature_store.get_features(team1, team2, venue)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
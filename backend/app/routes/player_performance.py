@@ -1,20 +1,37 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List
 import joblib
 import pandas as pd
 import os
 
+from app.services.model_registry import model_registry
+
 router = APIRouter()
 
 # Load models and summaries once at startup
 BASE_PATH = os.path.dirname(os.path.abspath(__file__))
 MODELS_PATH = os.path.join(BASE_PATH, "../services/models")
 
-batter_model = joblib.load(os.path.join(MODELS_PATH, "batter_model.pkl"))
-bowler_model = joblib.load(os.path.join(MODELS_PATH, "bowler_model.pkl"))
-batter_summary = joblib.load(os.path.join(MODELS_PATH, "batter_summary.pkl"))
-bowler_summary = joblib.load(os.path.join(MODELS_PATH, "bowler_summary.pkl"))
+ARTIFACTS = {
+    'batter_model': os.path.join(MODELS_PATH, "batter_model.pkl"),
+    'bowler_model': os.path.join(MODELS_PATH, "bowler_model.pkl"),
+    'batter_summary': os.path.join(MODELS_PATH, "batter_summary.pkl"),
+    'bowler_summary': os.path.join(MODELS_PATH, "bowler_summary.pkl"),
+}
+
+def _load_performance_models():
+    return {name: joblib.load(path) for name, path in ARTIFACTS.items()}
+
+model_registry.register(
+    'player_performance', _load_performance_models, list(ARTIFACTS.values())
+)
+
+def _get_bundle():
+    bundle = model_registry.get('player_performance')
+    if bundle is None:
+        raise HTTPException(status_code=503, detail="Player performance models not loaded")
+    return bundle
 
 class PlayerIn(BaseModel):
     name: str
@@ -39,33 +56,40 @@ class PredictionResponse(BaseModel):
 
 @router.post("/predict_player_performance", response_model=PredictionResponse)
 def predict_player_performance(players: List[PlayerIn]):
-    predictions = []
-    for player in players:
-        # Lookup stats
-        bat_row = batter_summary[batter_summary['batter'] == player.name]
-        bowl_row = bowler_summary[bowler_summary['bowler'] == player.name]
-        total_runs = bat_row['total_runs'].values[0] if not bat_row.empty else 0
-        strike_rate = bat_row['strike_rate'].values[0] if not bat_row.empty else 100.0
-        total_wickets = bowl_row['total_wickets'].values[0] if not bowl_row.empty else 0
-        economy = bowl_row['economy'].values[0] if not bowl_row.empty else 8.0
-
-        # Predict
-        predicted_runs = 0
-        predicted_wickets = 0
-        if player.role in ['Batsman', 'All-rounder', 'Wicket-keeper']:
-            bat_input = pd.DataFrame([[total_runs, strike_rate]], columns=['total_runs', 'strike_rate'])
-            predicted_runs = int(round(batter_model.predict(bat_input)[0]))
-        if player.role in ['Bowler', 'All-rounder']:
-            bowl_input = pd.DataFrame([[total_wickets, economy]], columns=['total_wickets', 'economy'])
-            predicted_wickets = int(round(bowler_model.predict(bowl_input)[0]))
-
-        predictions.append({
-            "name": player.name,
-            "team": player.team,
-            "role": player.role,
-            "predicted_runs": predicted_runs,
-            "predicted_wickets": predicted_wickets
-        })
+    def _predict(bundle):
+        if bundle is None:
+            raise HTTPException(status_code=503, detail="Player performance models not loaded")
+        batter_summary, bowler_summary = bundle['batter_summary'], bundle['bowler_summary']
+        predictions = []
+        for player in players:
+            # Lookup stats
+            bat_row = batter_summary[batter_summary['batter'] == player.name]
+            bowl_row = bowler_summary[bowler_summary['bowler'] == player.name]
+            total_runs = bat_row['total_runs'].values[0] if not bat_row.empty else 0
+            strike_rate = bat_row['strike_rate'].values[0] if not bat_row.empty else 100.0
+            total_wickets = bowl_row['total_wickets'].values[0] if not bowl_row.empty else 0
+            economy = bowl_row['economy'].values[0] if not bowl_row.empty else 8.0
+
+            # Predict
+            predicted_runs = 0
+            predicted_wickets = 0
+            if player.role in ['Batsman', 'All-rounder', 'Wicket-keeper']:
+                bat_input = pd.DataFrame([[total_runs, strike_rate]], columns=['total_runs', 'strike_rate'])
+                predicted_runs = int(round(bundle['batter_model'].predict(bat_input)[0]))
+            if player.role in ['Bowler', 'All-rounder']:
+                bowl_input = pd.DataFrame([[total_wickets, economy]], columns=['total_wickets', 'economy'])
+                predicted_wickets = int(round(bundle['bowler_model'].predict(bowl_input)[0]))
+
+            predictions.append({
+                "name": player.name,
+                "team": player.team,
+                "role": player.role,
+                "predicted_runs": predicted_runs,
+                "predicted_wickets": predicted_wickets
+            })
+        return predictions
+
+    predictions = model_registry.run('player_performance', _predict)
 
     # Team summary
     total_runs = sum(p["predicted_runs"] for p in predictions)
@@ -83,6 +107,8 @@ def predict_player_performance(players: List[PlayerIn]):
 
 @router.get("/all_players")
 def get_all_players():
+    bundle = _get_bundle()
+    batter_summary, bowler_summary = bundle['batter_summary'], bundle['bowler_summary']
     batter_names = set(batter_summary['batter'].unique())
     bowler_names = set(bowler_summary['bowler'].unique())
     all_names = sorted(batter_names | bowler_names)
@@ -90,6 +116,8 @@ def get_all_players():
 
 @router.get("/player_info/{name}")
 def get_player_info(name: str):
+    bundle = _get_bundle()
+    batter_summary, bowler_summary = bundle['batter_summary'], bundle['bowler_summary']
     bat_row = batter_summary[batter_summary['batter'] == name]
     bowl_row = bowler_summary[bowler_summary['bowler'] == name]
 
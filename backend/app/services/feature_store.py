@@ -0,0 +1,290 @@
+import os
+import re
+import threading
+import numpy as np
+
+from app.services.ml_models import predict_match_winner, MODEL_DIR
+from app.services.model_registry import model_registry
+from app.services.snapshots import save_npz_atomic
+
+FEATURE_STORE_PATH = os.getenv(
+    "FEATURE_STORE_PATH", os.path.join(MODEL_DIR, "match_feature_store.npz")
+)
+
+# Number of recent matches used for team form
+FORM_WINDOW = 5
+# Value returned for a ratio with no history behind it
+DEFAULT_RATIO = 0.5
+
+# Franchise renames, mapped to the names known by le_dict
+TEAM_ALIASES = {
+    'Delhi Daredevils': 'Delhi Capitals',
+    'Kings XI Punjab': 'Punjab Kings',
+    'Rising Pune Supergiant': 'Rising Pune Supergiants',
+}
+
+# Grounds that were renamed, keyed by their normalised name
+VENUE_RENAMES = {
+    'feroz shah kotla': 'arun jaitley stadium',
+    'punjab cricket association stadium': 'punjab cricket association is bindra stadium',
+    'sardar patel stadium': 'narendra modi stadium',
+    'zayed cricket stadium': 'sheikh zayed stadium',
+}
+
+
+def canonical_venue(venue: str):
+    """
+    Normalises a venue name so aliases such as "Eden Gardens" and
+    "Eden Gardens, Kolkata" share one key.
+    """
+    key = venue.split(',')[0].lower()
+    key = re.sub(r'[^a-z0-9]+', ' ', key).strip()
+    return VENUE_RENAMES.get(key, key)
+
+
+def canonical_team(team: str):
+    return TEAM_ALIASES.get(team, team)
+
+
+class MatchFeatureStore:
+    """
+    Precomputed team form, venue win ratios and head-to-head ratios.
+
+    Aggregates live in dense NumPy arrays indexed by the le_dict team codes and
+    by canonical venue, and are updated in place as results are recorded, so
+    assembling the inputs for predict_match_winner is a handful of array reads.
+    Args:
+        teams (list): Team names in le_dict code order
+        venues (list): Venue names in le_dict code order
+    """
+
+    def __init__(self, teams, venues):
+        self.teams = list(teams)
+        self.venues = list(venues)
+        self.team_codes = {t: i for i, t in enumerate(self.teams)}
+        self.venue_codes = {v: i for i, v in enumerate(self.venues)}
+
+        self.canonical_venues = sorted({canonical_venue(v) for v in self.venues})
+        self.canonical_codes = {v: i for i, v in enumerate(self.canonical_venues)}
+        # le_dict venue code -> canonical venue code
+        self.venue_canon = np.array(
+            [self.canonical_codes[canonical_venue(v)] for v in self.venues], dtype=np.int64
+        )
+        # canonical venue -> first le_dict code that shares it
+        self.canonical_to_code = {}
+        for code, canon in enumerate(self.venue_canon.tolist()):
+            self.canonical_to_code.setdefault(self.canonical_venues[canon], code)
+
+        n_teams, n_venues = len(self.teams), len(self.canonical_venues)
+        self.recent = np.zeros((n_teams, FORM_WINDOW))
+        self.recent_count = np.zeros(n_teams, dtype=np.int64)
+        self.form = np.full(n_teams, DEFAULT_RATIO)
+        self.venue_played = np.zeros((n_teams, n_venues), dtype=np.int64)
+        self.venue_wins = np.zeros((n_teams, n_venues), dtype=np.int64)
+        self.venue_ratio = np.full((n_teams, n_venues), DEFAULT_RATIO)
+        self.h2h_played = np.zeros((n_teams, n_teams), dtype=np.int64)
+        self.h2h_wins = np.zeros((n_teams, n_teams), dtype=np.int64)
+        self.h2h_ratio = np.full((n_teams, n_teams), DEFAULT_RATIO)
+        self.matches = 0
+        self._lock = threading.Lock()
+
+    def team_code(self, team: str):
+        team = canonical_team(team)
+        if team not in self.team_codes:
+            raise ValueError(f"Unknown team: {team}")
+        return self.team_codes[team]
+
+    def venue_code(self, venue: str):
+        """Returns the le_dict code for venue, falling back to any alias of it."""
+        if venue in self.venue_codes:
+            return self.venue_codes[venue]
+        key = canonical_venue(venue)
+        if key not in self.canonical_to_code:
+            raise ValueError(f"Unknown venue: {venue}")
+        return self.canonical_to_code[key]
+
+    def _record(self, t1: int, t2: int, v: int, winner: int):
+        for team in (t1, t2):
+            won = 1.0 if team == winner else 0.0
+            # Ring buffer of the last FORM_WINDOW results
+            self.recent[team, self.recent_count[team] % FORM_WINDOW] = won
+            self.recent_count[team] += 1
+            self.form[team] = self.recent[team].sum() / min(self.recent_count[team], FORM_WINDOW)
+
+            self.venue_played[team, v] += 1
+            self.venue_wins[team, v] += int(won)
+            self.venue_ratio[team, v] = self.venue_wins[team, v] / self.venue_played[team, v]
+
+        for a, b in ((t1, t2), (t2, t1)):
+            self.h2h_played[a, b] += 1
+            self.h2h_wins[a, b] += int(a == winner)
+            self.h2h_ratio[a, b] = self.h2h_wins[a, b] / self.h2h_played[a, b]
+        self.matches += 1
+
+    def _resolve(self, team1: str, team2: str, venue: str, winner: str):
+        t1, t2 = self.team_code(team1), self.team_code(team2)
+        if t1 == t2:
+            raise ValueError(f"A team cannot play itself: {team1} vs {team2}")
+        w = self.team_code(winner)
+        if w not in (t1, t2):
+            raise ValueError(f"Winner {winner} did not play in this match")
+        return t1, t2, int(self.venue_canon[self.venue_code(venue)]), w
+
+    def record_result(self, team1: str, team2: str, venue: str, winner: str):
+        """Updates all aggregates with one completed match."""
+        self.record_results([(team1, team2, venue, winner)])
+
+    def record_results(self, results):
+        """
+        Records (team1, team2, venue, winner) results all or nothing.
+        Every result is validated before any aggregate changes.
+        """
+        resolved = [self._resolve(*result) for result in results]
+        with self._lock:
+            for t1, t2, v, w in resolved:
+                self._record(t1, t2, v, w)
+
+    def get_features(self, team1: str, team2: str, venue: str):
+        """
+        Returns the precomputed inputs expected by predict_match_winner.
+        """
+        t1, t2 = self.team_code(team1), self.team_code(team2)
+        v = self.venue_canon[self.venue_code(venue)]
+        with self._lock:
+            return {
+                'team1_form': float(self.form[t1]),
+                'team2_form': float(self.form[t2]),
+                'venue_win_ratio_team1': float(self.venue_ratio[t1, v]),
+                'venue_win_ratio_team2': float(self.venue_ratio[t2, v]),
+                'head_to_head_ratio': float(self.h2h_ratio[t1, t2]),
+            }
+
+    def save(self, path: str = FEATURE_STORE_PATH):
+        with self._lock:
+            save_npz_atomic(
+                path,
+                teams=np.array(self.teams),
+                canonical_venues=np.array(self.canonical_venues),
+                recent=self.recent,
+                recent_count=self.recent_count,
+                form=self.form,
+                venue_played=self.venue_played,
+                venue_wins=self.venue_wins,
+                venue_ratio=self.venue_ratio,
+                h2h_played=self.h2h_played,
+                h2h_wins=self.h2h_wins,
+                h2h_ratio=self.h2h_ratio,
+                matches=np.array(self.matches),
+            )
+
+    def load(self, path: str = FEATURE_STORE_PATH):
+        """Restores a snapshot written by save. Returns False if it does not match the encoders."""
+        data = np.load(path)
+        if (data['teams'].tolist() != self.teams
+                or data['canonical_venues'].tolist() != self.canonical_venues):
+            return False
+        with self._lock:
+            for name in ('recent', 'recent_count', 'form', 'venue_played', 'venue_wins',
+                         'venue_ratio', 'h2h_played', 'h2h_wins', 'h2h_ratio'):
+                setattr(self, name, data[name].copy())
+            self.matches = int(data['matches'])
+        return True
+
+
+    def rebuilt_for(self, teams, venues):
+        """
+        Returns a store for new encoder classes with the aggregates of every
+        team and canonical venue known to both carried over by name.
+        """
+        store = MatchFeatureStore(teams, venues)
+        old_t = [i for i, t in enumerate(self.teams) if t in store.team_codes]
+        new_t = [store.team_codes[self.teams[i]] for i in old_t]
+        old_v = [i for i, v in enumerate(self.canonical_venues) if v in store.canonical_codes]
+        new_v = [store.canonical_codes[self.canonical_venues[i]] for i in old_v]
+        with self._lock:
+            for name in ('recent', 'recent_count', 'form'):
+                getattr(store, name)[new_t] = getattr(self, name)[old_t]
+            for name in ('venue_played', 'venue_wins', 'venue_ratio'):
+                getattr(store, name)[np.ix_(new_t, new_v)] = getattr(self, name)[np.ix_(old_t, old_v)]
+            for name in ('h2h_played', 'h2h_wins', 'h2h_ratio'):
+                getattr(store, name)[np.ix_(new_t, new_t)] = getattr(self, name)[np.ix_(old_t, old_t)]
+            store.matches = self.matches
+        return store
+
+
+def _load_feature_store():
+    bundle = model_registry.get('match_winner')
+    if bundle is None:
+        return None
+    le_dict = bundle['le_dict']
+    store = MatchFeatureStore(le_dict['team1'].classes_, le_dict['venue'].classes_)
+    if os.path.exists(FEATURE_STORE_PATH):
+        try:
+            if not store.load(FEATURE_STORE_PATH):
+                print("Warning: Feature store snapshot does not match encoders, starting empty.")
+        except Exception as e:
+            print(f"Warning: Could not load feature store snapshot: {e}")
+    return store
+
+feature_store = _load_feature_store()
+# Held while results are recorded and while the store is replaced on a model swap,
+# so results never land in a store that is about to be discarded
+_store_lock = threading.Lock()
+
+
+def get_feature_store():
+    return feature_store
+
+
+def record_match_results(results):
+    """
+    Records (team1, team2, venue, winner) results into the current store and
+    saves it. Returns the total number of matches recorded.
+    """
+    with _store_lock:
+        store = feature_store
+        if store is None:
+            raise RuntimeError("Feature store not loaded")
+        store.record_results(results)
+        store.save()
+        return store.matches
+
+
+def _on_match_winner_swap(bundle):
+    """Rebuilds the store for the encoder classes of a hot-reloaded match winner model."""
+    global feature_store
+    le_dict = bundle['le_dict']
+    teams, venues = le_dict['team1'].classes_, le_dict['venue'].classes_
+    with _store_lock:
+        if feature_store is None:
+            feature_store = MatchFeatureStore(teams, venues)
+        elif list(teams) != feature_store.teams or list(venues) != feature_store.venues:
+            feature_store = feature_store.rebuilt_for(teams, venues)
+        else:
+            return
+        feature_store.save()
+
+model_registry.subscribe('match_winner', _on_match_winner_swap)
+
+
+def predict_match_winner_from_store(team1: str, team2: str, venue: str, toss_winner: str, toss_decision: str):
+    """
+    Predicts the match winner using only team, venue and toss inputs.
+    Historical features are read from the feature store.
+    """
+    store = feature_store
+    if store is None:
+        raise RuntimeError("Match winner model or encoders not loaded.")
+    features = store.get_features(team1, team2, venue)
+    # Key order matches the column order the model was trained on
+    match_features = {
+        'team1': canonical_team(team1),
+        'team2': canonical_team(team2),
+        'venue': store.venues[store.venue_code(venue)],
+        'toss_winner': canonical_team(toss_winner),
+        'toss_decision': toss_decision,
+        **features,
+    }
+    result = predict_match_winner(match_features)
+    result['features_used'] = match_features
+    return result
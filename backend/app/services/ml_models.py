@@ -3,6 +3,8 @@ import joblib
 import numpy as np
 import pandas as pd
 
+from app.services.model_registry import model_registry
+
 # Try to import TensorFlow, but don't fail if it's not available
 try:
     import tensorflow as tf
@@ -27,40 +29,31 @@ SCORE_MODEL_PATH = os.path.join(LIVE_MATCH_MODEL_DIR, "ipl_score_predictor_model
 SCALER_PATH = os.path.join(LIVE_MATCH_MODEL_DIR, "score_scaler.pkl")  # Assume scaler is saved here
 FEATURE_COLUMNS_PATH = os.path.join(LIVE_MATCH_MODEL_DIR, "score_feature_columns.pkl")
 
-# Load model and encoders at module load
+# Loaders used by the model registry, both at startup and on hot reload
 def _load_model_and_encoders():
-    try:
-        model = joblib.load(MODEL_PATH)
-        le_dict = joblib.load(LE_DICT_PATH)
-        label_encoder = joblib.load(LABEL_ENCODER_PATH)
-        return model, le_dict, label_encoder
-    except Exception as e:
-        print(f"Warning: Could not load match winner models: {e}")
-        return None, None, None
-
-best_model, le_dict, label_encoder = _load_model_and_encoders()
-
-# Load Keras model and scaler at module load (if available)
+    return {
+        'model': joblib.load(MODEL_PATH),
+        'le_dict': joblib.load(LE_DICT_PATH),
+        'label_encoder': joblib.load(LABEL_ENCODER_PATH),
+    }
+
 def _load_score_model_and_scaler():
     if not TF_AVAILABLE or tf is None:
         raise ImportError("TensorFlow not available")
-    model = tf.keras.models.load_model(SCORE_MODEL_PATH, compile=False)
-    scaler = joblib.load(SCALER_PATH)
-    return model, scaler
-
-try:
-    score_model, score_scaler = _load_score_model_and_scaler()
-    print("Score model loaded:", score_model is not None)
-    print("Score scaler loaded:", score_scaler is not None)
-except Exception as e:
-    print("MODEL/SCALER LOAD ERROR:", e)
-    score_model, score_scaler = None, None
+    return {
+        'model': tf.keras.models.load_model(SCORE_MODEL_PATH, compile=False),
+        'scaler': joblib.load(SCALER_PATH),
+        'feature_columns': joblib.load(FEATURE_COLUMNS_PATH),
+    }
 
-try:
-    feature_columns = joblib.load(FEATURE_COLUMNS_PATH)
-except Exception as e:
-    print(f"Warning: Could not load feature columns: {e}")
-    feature_columns = []
+model_registry.register(
+    'match_winner', _load_model_and_encoders,
+    [MODEL_PATH, LE_DICT_PATH, LABEL_ENCODER_PATH],
+)
+model_registry.register(
+    'score', _load_score_model_and_scaler,
+    [SCORE_MODEL_PATH, SCALER_PATH, FEATURE_COLUMNS_PATH],
+)
 
 # List of all possible teams and venues for one-hot encoding (should match training)
 ALL_TEAMS = [
@@ -130,44 +123,70 @@ ALL_VENUES = [
     "Zayed Cricket Stadium, Abu Dhabi"
 ]
 
-def preprocess_score_features(features: dict):
+SCORE_NUM_COLS = ['current_score', 'wickets', 'runs_last_5', 'balls_remaining', 'run_rate', 'required_run_rate']
+SCORE_INPUT_COLS = ['batting_team', 'bowling_team', 'venue', 'over', 'ball', 'current_score', 'wickets', 'runs_last_5']
+
+def preprocess_score_features_batch(df: pd.DataFrame, bundle: dict = None):
+    """
+    Vectorized version of the live match feature encoding.
+    Args:
+        df (pd.DataFrame): One match state per row with the LiveMatchInput columns, 'target' is optional
+        bundle (dict): Score model version to encode for, defaults to the active one
+    Returns:
+        pd.DataFrame: Scaled model inputs aligned to feature_columns
+    """
+    if bundle is None:
+        bundle = model_registry.get('score')
     # Compute derived features
-    ball_no = features['over'] * 6 + features['ball']
+    ball_no = (df['over'] * 6 + df['ball']).to_numpy(dtype=np.float64)
     balls_remaining = 120 - ball_no
-    run_rate = features['current_score'] / (ball_no / 6) if ball_no > 0 else 0
+    current_score = df['current_score'].to_numpy(dtype=np.float64)
+    run_rate = np.divide(current_score, ball_no / 6, out=np.zeros(len(df)), where=ball_no > 0)
 
-    # Compute required_run_rate (if 'target' is provided)
-    if 'target' in features and features['target'] is not None:
-        runs_required = features['target'] - features['current_score']
-        required_run_rate = runs_required / (balls_remaining / 6) if balls_remaining > 0 else 0
+    # Compute required_run_rate for rows where a target is provided
+    if 'target' in df.columns:
+        target = pd.to_numeric(df['target'], errors='coerce').to_numpy(dtype=np.float64)
+        runs_required = target - current_score
+        has_target = ~np.isnan(target) & (balls_remaining > 0)
+        required_run_rate = np.divide(
+            runs_required, balls_remaining / 6, out=np.zeros(len(df)), where=has_target
+        )
     else:
-        required_run_rate = 0
+        required_run_rate = np.zeros(len(df))
 
-    # Build the row to match the notebook model
-    row = {}
+    # Build the one-hot columns to match the notebook model
+    columns = {}
+    batting_team = df['batting_team'].to_numpy()
+    bowling_team = df['bowling_team'].to_numpy()
+    venue_col = df['venue'].to_numpy()
     for team in ALL_TEAMS[1:]:  # drop_first=True in get_dummies
-        row[f'batting_team_{team}'] = 1 if features['batting_team'] == team else 0
+        columns[f'batting_team_{team}'] = (batting_team == team).astype(np.int64)
     for team in ALL_TEAMS[1:]:
-        row[f'bowling_team_{team}'] = 1 if features['bowling_team'] == team else 0
+        columns[f'bowling_team_{team}'] = (bowling_team == team).astype(np.int64)
     for venue in ALL_VENUES[1:]:
-        row[f'venue_{venue}'] = 1 if features['venue'] == venue else 0
-    # Add numeric and derived features
-    row['current_score'] = features['current_score']
-    row['wickets'] = features['wickets']
-    row['runs_last_5'] = features['runs_last_5']
-    row['balls_remaining'] = balls_remaining
-    row['run_rate'] = run_rate
-    row['required_run_rate'] = required_run_rate
-
-    # Convert to DataFrame
-    X = pd.DataFrame([row])
-    # Scale numeric columns
-    num_cols = ['current_score', 'wickets', 'runs_last_5', 'balls_remaining', 'run_rate', 'required_run_rate']
-    X[num_cols] = score_scaler.transform(X[num_cols])
+        columns[f'venue_{venue}'] = (venue_col == venue).astype(np.int64)
+
+    # Scale numeric and derived features
+    numeric = pd.DataFrame({
+        'current_score': df['current_score'].to_numpy(),
+        'wickets': df['wickets'].to_numpy(),
+        'runs_last_5': df['runs_last_5'].to_numpy(),
+        'balls_remaining': balls_remaining,
+        'run_rate': run_rate,
+        'required_run_rate': required_run_rate,
+    })
+    scaled = bundle['scaler'].transform(numeric[SCORE_NUM_COLS])
+    for i, col in enumerate(SCORE_NUM_COLS):
+        columns[col] = scaled[:, i]
+
+    X = pd.DataFrame(columns)
     # Align columns to match training
-    X = X.reindex(columns=feature_columns, fill_value=0)
+    X = X.reindex(columns=bundle['feature_columns'], fill_value=0)
     return X
 
+def preprocess_score_features(features: dict, bundle: dict = None):
+    return preprocess_score_features_batch(pd.DataFrame([features]), bundle)
+
 def get_certainty(prob):
     if prob > 0.8 or prob < 0.2:
         return "high"
@@ -177,14 +196,37 @@ def get_certainty(prob):
         return "low"
 
 def predict_innings_score(features: dict):
-    if not TF_AVAILABLE or score_model is None or score_scaler is None:
-        raise RuntimeError("Score prediction model or scaler not loaded.")
-    X = preprocess_score_features(features)
-    score_pred, win_prob = score_model.predict(X)
-    predicted_score = int(round(score_pred[0][0]))
-    win_probability = float(win_prob[0][0])
-    certainty = get_certainty(win_probability)
-    return predicted_score, win_probability, certainty, features
+    def _score(bundle):
+        if not TF_AVAILABLE or bundle is None:
+            raise RuntimeError("Score prediction model or scaler not loaded.")
+        X = preprocess_score_features(features, bundle)
+        score_pred, win_prob = bundle['model'].predict(X)
+        predicted_score = int(round(score_pred[0][0]))
+        win_probability = float(win_prob[0][0])
+        certainty = get_certainty(win_probability)
+        return predicted_score, win_probability, certainty, features
+    return model_registry.run('score', _score)
+
+def predict_innings_scores_batch(df: pd.DataFrame, batch_size: int = 4096):
+    """
+    Scores many match states at once with the same encoding as predict_innings_score.
+    Returns:
+        pd.DataFrame: predicted_score, win_probability_team1, win_probability_team2, certainty
+    """
+    def _score(bundle):
+        if not TF_AVAILABLE or bundle is None:
+            raise RuntimeError("Score prediction model or scaler not loaded.")
+        X = preprocess_score_features_batch(df, bundle)
+        score_pred, win_prob = bundle['model'].predict(X, batch_size=batch_size, verbose=0)
+        predicted_score = [int(round(s)) for s in score_pred[:, 0]]
+        win_probability = [float(p) for p in win_prob[:, 0]]
+        return pd.DataFrame({
+            'predicted_score': predicted_score,
+            'win_probability_team1': win_probability,
+            'win_probability_team2': [1 - p for p in win_probability],
+            'certainty': [get_certainty(p) for p in win_probability],
+        }, index=df.index)
+    return model_registry.run('score', _score)
 
 def predict_match_winner(match_features: dict):
     """
@@ -195,26 +237,31 @@ def predict_match_winner(match_features: dict):
     Returns:
         dict: {predicted_winner, confidence, team_probabilities}
     """
-    # Convert to DataFrame
-    new_df = pd.DataFrame([match_features])
-    # Encode categorical values
-    for col in ['team1', 'team2', 'venue', 'toss_winner']:
-        if col in le_dict and new_df[col].iloc[0] in le_dict[col].classes_:
-            new_df[col] = le_dict[col].transform(new_df[col])
-        else:
-            raise ValueError(f"Unknown value in {col}: {new_df[col].iloc[0]}")
-    # Encode toss_decision manually
-    new_df['toss_decision'] = 0 if new_df['toss_decision'].iloc[0] == 'bat' else 1
-    # Prepare input for model
-    X = new_df.values
-    # Predict probabilities
-    probs = best_model.predict_proba(X)[0]
-    pred_class = np.argmax(probs)
-    confidence = float(probs[pred_class]) * 100
-    predicted_winner = label_encoder.inverse_transform([pred_class])[0]
-    team_probs = {label_encoder.inverse_transform([i])[0]: float(prob) for i, prob in enumerate(probs)}
-    return {
-        "predicted_winner": predicted_winner,
-        "confidence": confidence,
-        "team_probabilities": team_probs
-    } 
\ No newline at end of file
+    def _predict(bundle):
+        if bundle is None:
+            raise RuntimeError("Match winner model or encoders not loaded.")
+        le_dict, label_encoder = bundle['le_dict'], bundle['label_encoder']
+        # Convert to DataFrame
+        new_df = pd.DataFrame([match_features])
+        # Encode categorical values
+        for col in ['team1', 'team2', 'venue', 'toss_winner']:
+            if col in le_dict and new_df[col].iloc[0] in le_dict[col].classes_:
+                new_df[col] = le_dict[col].transform(new_df[col])
+            else:
+                raise ValueError(f"Unknown value in {col}: {new_df[col].iloc[0]}")
+        # Encode toss_decision manually
+        new_df['toss_decision'] = 0 if new_df['toss_decision'].iloc[0] == 'bat' else 1
+        # Prepare input for model
+        X = new_df.values
+        # Predict probabilities
+        probs = bundle['model'].predict_proba(X)[0]
+        pred_class = np.argmax(probs)
+        confidence = float(probs[pred_class]) * 100
+        predicted_winner = label_encoder.inverse_transform([pred_class])[0]
+        team_probs = {label_encoder.inverse_transform([i])[0]: float(prob) for i, prob in enumerate(probs)}
+        return {
+            "predicted_winner": predicted_winner,
+            "confidence": confidence,
+            "team_probabilities": team_probs
+        }
+    return model_registry.run('match_winner', _predict)
@@ -0,0 +1,370 @@
+import gc
+import hashlib
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+
+# Recent latency samples kept per version for percentiles
+LATENCY_WINDOW = 1000
+# Number of retired versions kept in the status history
+HISTORY_LENGTH = 5
+# Shadow calls queued beyond this are skipped rather than piling up under load
+MAX_SHADOW_INFLIGHT = 8
+
+
+def artifact_version(paths):
+    """
+    Short version identifier for a set of artifact files, hashed from their
+    names, sizes and modification times rather than their contents, so it is
+    cheap to compute on every reload request. Missing files are part of the hash.
+    """
+    h = hashlib.sha1()
+    for path in paths:
+        h.update(os.path.basename(path).encode())
+        try:
+            st = os.stat(path)
+            h.update(f"{st.st_size}:{st.st_mtime_ns}".encode())
+        except OSError:
+            h.update(b"missing")
+    return h.hexdigest()[:12]
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _numeric_values(obj):
+    """Flattens the numeric parts of a prediction result for drift comparison."""
+    if obj is None or isinstance(obj, (str, bool)):
+        return []
+    if isinstance(obj, (int, float, np.integer, np.floating)):
+        return [float(obj)]
+    if isinstance(obj, dict):
+        return [v for key in sorted(obj, key=str) for v in _numeric_values(obj[key])]
+    if hasattr(obj, 'select_dtypes'):  # pandas DataFrame
+        return obj.select_dtypes('number').to_numpy(dtype=np.float64).ravel().tolist()
+    if isinstance(obj, np.ndarray):
+        return obj.astype(np.float64, copy=False).ravel().tolist() if obj.dtype.kind in 'biuf' else []
+    if isinstance(obj, (list, tuple)):
+        return [v for item in obj for v in _numeric_values(item)]
+    return []
+
+
+class VersionStats:
+    """Latency and shadow drift counters for one load of an artifact version."""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.drift_samples = 0
+        self.drift_mismatches = 0
+        self.drift_total = 0.0
+        self.drift_max = 0.0
+        self._lock = threading.Lock()
+
+    def record_latency(self, seconds: float, error: bool = False):
+        with self._lock:
+            self.requests += 1
+            self.errors += int(error)
+            self.latencies.append(seconds)
+
+    def record_drift(self, active_result, shadow_result):
+        a = np.array(_numeric_values(active_result))
+        b = np.array(_numeric_values(shadow_result))
+        with self._lock:
+            self.drift_samples += 1
+            if a.shape != b.shape:
+                self.drift_mismatches += 1
+                return
+            diff = float(np.abs(a - b).max()) if a.size else 0.0
+            self.drift_total += diff
+            self.drift_max = max(self.drift_max, diff)
+
+    def summary(self):
+        with self._lock:
+            latencies = np.array(self.latencies) * 1000
+            matched = self.drift_samples - self.drift_mismatches
+            return {
+                'requests': self.requests,
+                'errors': self.errors,
+                'latency_ms': {
+                    'mean': round(float(latencies.mean()), 3) if latencies.size else None,
+                    'p50': round(float(np.percentile(latencies, 50)), 3) if latencies.size else None,
+                    'p95': round(float(np.percentile(latencies, 95)), 3) if latencies.size else None,
+                },
+                'drift': {
+                    'samples': self.drift_samples,
+                    'mismatches': self.drift_mismatches,
+                    'mean_abs_diff': round(self.drift_total / matched, 6) if matched else None,
+                    'max_abs_diff': round(self.drift_max, 6),
+                },
+            }
+
+
+class ModelSlot:
+    """
+    One named group of artifacts that are loaded and swapped together.
+
+    Every load gets its own id (artifact version plus a load counter), so a
+    forced reload of unchanged files is tracked separately from the version
+    it replaces.
+    Args:
+        name (str): Slot name used by the admin endpoint
+        loader (callable): Returns the loaded bundle, raises on failure
+        artifacts (list): Files whose change produces a new version
+    """
+
+    def __init__(self, name: str, loader, artifacts):
+        self.name = name
+        self.loader = loader
+        self.artifacts = list(artifacts)
+        self.active = None
+        self.active_version = None
+        self.active_load = None
+        self.active_loaded_at = None
+        self.candidate = None
+        self.candidate_version = None
+        self.candidate_load = None
+        self.state = 'empty'
+        self.error = None
+        self.stats = {}
+        self.history = deque(maxlen=HISTORY_LENGTH)
+        self.listeners = []
+        self._loads = 0
+        self._lock = threading.Lock()
+        self._reload_thread = None
+
+    def _next_load_id(self, version):
+        self._loads += 1
+        return f"{version}-{self._loads}"
+
+    def _stats_for(self, load_id):
+        with self._lock:
+            if load_id not in self.stats:
+                self.stats[load_id] = VersionStats()
+            return self.stats[load_id]
+
+    def load_initial(self):
+        version = artifact_version(self.artifacts)
+        try:
+            self.active = self.loader()
+            self.state = 'active'
+        except Exception as e:
+            print(f"Warning: Could not load {self.name} artifacts: {e}")
+            self.error = str(e)
+            self.state = 'failed'
+        self.active_version = version
+        self.active_load = self._next_load_id(version)
+        self.active_loaded_at = _utcnow()
+
+    def status(self):
+        with self._lock:
+            loads = list(self.stats.items())
+            status = {
+                'name': self.name,
+                'state': self.state,
+                'error': self.error,
+                'active_version': self.active_version,
+                'active_load': self.active_load,
+                'active_loaded': self.active is not None,
+                'active_loaded_at': self.active_loaded_at,
+                'candidate_version': self.candidate_version,
+                'candidate_load': self.candidate_load,
+                'artifacts': [os.path.basename(p) for p in self.artifacts],
+                'history': list(self.history),
+            }
+        status['loads'] = {load_id: stats.summary() for load_id, stats in loads}
+        return status
+
+
+class ModelRegistry:
+    """
+    Holds the live version of every model artifact group and swaps in new
+    versions without a restart.
+
+    Requests read the active bundle once through run() or get(), so a swap
+    only affects requests that start after it and in-flight requests finish
+    on the version they started with. While a candidate is shadowing, run()
+    also scores the candidate off the request path to compare latency and
+    output drift. A candidate that errors or drifts too far is rejected and
+    the active version is kept.
+    """
+
+    def __init__(self):
+        self.slots = {}
+        self._shadow_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='shadow')
+        self._shadow_lock = threading.Lock()
+        self._shadow_inflight = 0
+
+    def register(self, name: str, loader, artifacts):
+        slot = ModelSlot(name, loader, artifacts)
+        slot.load_initial()
+        self.slots[name] = slot
+        return slot
+
+    def slot(self, name: str):
+        if name not in self.slots:
+            raise KeyError(f"Unknown model: {name}")
+        return self.slots[name]
+
+    def get(self, name: str):
+        return self.slot(name).active
+
+    def subscribe(self, name: str, callback):
+        """Registers callback(bundle) to run after a new version of name is swapped in."""
+        self.slot(name).listeners.append(callback)
+
+    def run(self, name: str, fn):
+        """
+        Calls fn with the active bundle and records its latency. If a candidate
+        is shadowing, fn is also run against it in the background.
+        """
+        slot = self.slot(name)
+        with slot._lock:
+            bundle, load_id = slot.active, slot.active_load
+            candidate, candidate_load = slot.candidate, slot.candidate_load
+            shadowing = candidate is not None and slot.state == 'shadowing'
+            if shadowing and self._shadow_inflight >= MAX_SHADOW_INFLIGHT:
+                shadowing = False
+        stats = slot._stats_for(load_id)
+        start = time.perf_counter()
+        try:
+            result = fn(bundle)
+        except Exception:
+            stats.record_latency(time.perf_counter() - start, error=True)
+            raise
+        stats.record_latency(time.perf_counter() - start)
+        if shadowing:
+            with self._shadow_lock:
+                self._shadow_inflight += 1
+            self._shadow_pool.submit(self._shadow, slot, fn, candidate, candidate_load, result)
+        return result
+
+    def _shadow(self, slot, fn, candidate, load_id, active_result):
+        stats = slot._stats_for(load_id)
+        start = time.perf_counter()
+        try:
+            result = fn(candidate)
+        except Exception:
+            stats.record_latency(time.perf_counter() - start, error=True)
+            return
+        finally:
+            with self._shadow_lock:
+                self._shadow_inflight -= 1
+        stats.record_latency(time.perf_counter() - start)
+        stats.record_drift(active_result, result)
+
+    def reload(self, name: str, shadow_requests: int = 0, shadow_timeout: float = 60.0,
+               force: bool = False, max_shadow_errors: int = 0, max_drift: float = None):
+        """
+        Starts loading the current artifacts for name in a background thread.
+        With shadow_requests > 0 the candidate is only swapped in if it was
+        compared on shadow_requests requests within shadow_timeout seconds,
+        with at most max_shadow_errors failed shadow calls, no output shape
+        mismatches and, when max_drift is set, no output differing by more
+        than max_drift.
+        Returns False if a reload is already running or nothing changed on disk.
+        """
+        slot = self.slot(name)
+        with slot._lock:
+            if slot._reload_thread is not None and slot._reload_thread.is_alive():
+                return False
+            version = artifact_version(slot.artifacts)
+            if version == slot.active_version and slot.active is not None and not force:
+                return False
+            slot.state = 'loading'
+            slot.error = None
+            slot.candidate_version = version
+            slot.candidate_load = slot._next_load_id(version)
+            slot._reload_thread = threading.Thread(
+                target=self._reload,
+                args=(slot, version, slot.candidate_load, shadow_requests, shadow_timeout,
+                      max_shadow_errors, max_drift),
+                name=f'reload-{name}', daemon=True,
+            )
+            slot._reload_thread.start()
+        return True
+
+    def _reject(self, slot, message):
+        with slot._lock:
+            slot.state = 'failed' if slot.active is None else 'active'
+            slot.error = message
+            slot.candidate = None
+            slot.candidate_version = None
+            slot.candidate_load = None
+
+    def _reload(self, slot, version, load_id, shadow_requests, shadow_timeout,
+                max_shadow_errors, max_drift):
+        try:
+            candidate = slot.loader()
+        except Exception as e:
+            self._reject(slot, f"Reload of {load_id} failed: {e}")
+            return
+
+        if shadow_requests > 0 and slot.active is not None:
+            stats = slot._stats_for(load_id)
+            with slot._lock:
+                slot.candidate = candidate
+                slot.state = 'shadowing'
+            deadline = time.monotonic() + shadow_timeout
+            while (stats.drift_samples + stats.errors < shadow_requests
+                   and stats.errors <= max_shadow_errors
+                   and time.monotonic() < deadline):
+                time.sleep(0.05)
+
+            reason = None
+            if stats.errors > max_shadow_errors:
+                reason = f"{stats.errors} shadow calls failed"
+            elif stats.drift_samples < shadow_requests:
+                reason = (f"only {stats.drift_samples} of {shadow_requests} shadow samples "
+                          f"collected within {shadow_timeout:g}s")
+            elif stats.drift_mismatches:
+                reason = f"{stats.drift_mismatches} shadow outputs had a different shape"
+            elif max_drift is not None and stats.drift_max > max_drift:
+                reason = f"output drift {stats.drift_max:.6g} exceeds {max_drift:.6g}"
+            if reason is not None:
+                candidate = None
+                self._reject(slot, f"Rejected {load_id}: {reason}")
+                gc.collect()
+                return
+
+        with slot._lock:
+            # Single reference assignment, requests see either the old or the new bundle
+            previous_load, previous_loaded_at = slot.active_load, slot.active_loaded_at
+            slot.active = candidate
+            slot.active_version = version
+            slot.active_load = load_id
+            slot.active_loaded_at = _utcnow()
+            slot.candidate = None
+            slot.candidate_version = None
+            slot.candidate_load = None
+            slot.state = 'active'
+            slot.history.appendleft({
+                'load': previous_load,
+                'loaded_at': previous_loaded_at,
+                'retired_at': slot.active_loaded_at,
+            })
+            keep = {load_id} | {h['load'] for h in slot.history}
+            slot.stats = {k: s for k, s in slot.stats.items() if k in keep}
+            listeners = list(slot.listeners)
+        for callback in listeners:
+            try:
+                callback(candidate)
+            except Exception as e:
+                print(f"Warning: {slot.name} swap listener failed: {e}")
+        # Drop our references to the old bundle so its memory can be reclaimed
+        # once in-flight requests using it have finished
+        candidate = None
+        gc.collect()
+
+    def status(self):
+        return {name: slot.status() for name, slot in self.slots.items()}
+
+
+model_registry = ModelRegistry()
@@ -0,0 +1,331 @@
+import os
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+from app.services.snapshots import save_npz_atomic
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
+BATTER_FEATURES = ['strike_rate', '4s', '6s']
+BOWLER_FEATURES = ['economy', 'wickets']
+
+# Lloyd iterations used by a full re-cluster
+RECLUSTER_MAX_ITER = 100
+
+
+class OnlineClusterModel:
+    """
+    Player clusters kept in memory and updated one player at a time.
+
+    Centroids live in standardized feature space. New or updated players are
+    assigned to the nearest centroid, which then moves towards them with a
+    mini-batch KMeans step (learning rate 1 / points seen by that centroid).
+    Per-cluster member lists and feature sums are maintained alongside, so
+    the cluster summaries never need a groupby.
+
+    The offline clusters were not fitted in this feature space (for batters
+    only part of the CSV assignments are nearest to their own centroid, see
+    agreement()), so an updated player keeps their offline cluster unless the
+    new stats cross into another centroid's region. A full re-cluster refits
+    the centroids and hands each label to the new centroid closest to the one
+    that carried it.
+    Args:
+        df (pd.DataFrame): Offline clustering output with player, cluster, cluster_label and feature columns
+        feature_cols (list): Numeric columns clustered on
+    """
+
+    def __init__(self, df: pd.DataFrame, feature_cols):
+        self.feature_cols = list(feature_cols)
+        self.players = df['player'].astype(str).tolist()
+        self.positions = {name.lower(): i for i, name in enumerate(self.players)}
+        # Copies, pandas may hand back read-only views
+        self.raw = np.array(df[self.feature_cols], dtype=np.float64)
+        self.assignments = np.array(df['cluster'], dtype=np.int64)
+
+        # Scaling is frozen at fit time so centroids stay comparable across updates
+        self.mean = self.raw.mean(axis=0)
+        self.std = self.raw.std(axis=0)
+        self.std[self.std == 0] = 1.0
+
+        n_clusters = int(self.assignments.max()) + 1
+        self.labels = [''] * n_clusters
+        for cluster, label in df[['cluster', 'cluster_label']].drop_duplicates().itertuples(index=False):
+            self.labels[int(cluster)] = str(label)
+
+        X = self._scale(self.raw)
+        self.centroids = np.zeros((n_clusters, len(self.feature_cols)))
+        for c in range(n_clusters):
+            members = X[self.assignments == c]
+            if len(members):
+                self.centroids[c] = members.mean(axis=0)
+        self.seen = np.bincount(self.assignments, minlength=n_clusters).astype(np.float64)
+        self._rebuild_aggregates()
+        self._lock = threading.Lock()
+
+    def _scale(self, X):
+        return (X - self.mean) / self.std
+
+    def _rebuild_aggregates(self):
+        n_clusters = len(self.labels)
+        self.members = [dict() for _ in range(n_clusters)]
+        for i, c in enumerate(self.assignments.tolist()):
+            self.members[c][i] = None
+        self.sums = np.zeros((n_clusters, len(self.feature_cols)))
+        np.add.at(self.sums, self.assignments, self.raw)
+        self._summary = None
+
+    def _nearest(self, x):
+        return int(np.argmin(((self.centroids - x) ** 2).sum(axis=1)))
+
+    def agreement(self):
+        """Share of players whose assigned cluster is also their nearest centroid."""
+        with self._lock:
+            X = self._scale(self.raw)
+            dist = ((X[:, None, :] - self.centroids[None, :, :]) ** 2).sum(axis=2)
+            return float((dist.argmin(axis=1) == self.assignments).mean())
+
+    def update(self, player: str, features: dict):
+        """
+        Adds a new player or updates an existing one and returns its cluster.
+        An existing player only changes cluster when the new stats are nearest
+        to a different centroid than the old ones were.
+        """
+        values = np.array([float(features[col]) for col in self.feature_cols])
+        if not np.isfinite(values).all():
+            raise ValueError(f"Non-finite feature values for {player}: {values.tolist()}")
+        x = self._scale(values)
+        with self._lock:
+            i = self.positions.get(player.lower())
+            if i is not None and np.array_equal(self.raw[i], values):
+                return self._get_player(i)
+            # Everything that can fail happens before any state changes
+            c = self._nearest(x)
+
+            if i is None:
+                i = len(self.players)
+                self.raw = np.vstack([self.raw, values])
+                self.assignments = np.append(self.assignments, c)
+                self.players.append(player)
+                # Published last so readers never see a position without its row
+                self.positions[player.lower()] = i
+            else:
+                if c == self._nearest(self._scale(self.raw[i])):
+                    c = int(self.assignments[i])
+                old = self.assignments[i]
+                del self.members[old][i]
+                self.sums[old] -= self.raw[i]
+                self.raw[i] = values
+
+            # Mini-batch KMeans centroid step
+            self.seen[c] += 1
+            self.centroids[c] += (x - self.centroids[c]) / self.seen[c]
+
+            self.assignments[i] = c
+            self.members[c][i] = None
+            self.sums[c] += values
+            self._summary = None
+            return self._get_player(i)
+
+    def recluster(self, max_iter: int = RECLUSTER_MAX_ITER):
+        """
+        Full KMeans pass over every player, warm started from the current
+        centroids. Each label is then moved to the new centroid closest to the
+        centroid that carried it, so a label names the group nearest to what
+        it described before.
+        Returns:
+            dict: {iterations, moved} where moved is the share of players whose label changed
+        """
+        with self._lock:
+            X = self._scale(self.raw)
+            centroids = self.centroids.copy()
+            assignments = self.assignments
+            for iteration in range(1, max_iter + 1):
+                dist = ((X[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2)
+                new_assignments = dist.argmin(axis=1)
+                for c in range(len(centroids)):
+                    members = X[new_assignments == c]
+                    if len(members):
+                        centroids[c] = members.mean(axis=0)
+                if np.array_equal(new_assignments, assignments):
+                    break
+                assignments = new_assignments
+
+            # Greedy matching of new centroids to old ones, closest pairs first
+            dist = ((centroids[:, None, :] - self.centroids[None, :, :]) ** 2).sum(axis=2)
+            label_of = np.zeros(len(centroids), dtype=np.int64)
+            for flat in np.argsort(dist, axis=None):
+                new, old = np.unravel_index(flat, dist.shape)
+                if np.isfinite(dist[new, old]):
+                    label_of[new] = old
+                    dist[new, :] = np.inf
+                    dist[:, old] = np.inf
+            relabelled = np.zeros_like(centroids)
+            relabelled[label_of] = centroids
+            assignments = label_of[assignments]
+
+            moved = float((assignments != self.assignments).mean())
+            self.centroids = relabelled
+            self.assignments = assignments
+            self.seen = np.bincount(self.assignments, minlength=len(self.labels)).astype(np.float64)
+            self._rebuild_aggregates()
+            return {'iterations': iteration, 'moved': round(moved, 4)}
+
+    def summary(self):
+        """
+        Per-cluster members, average raw features and count, sorted by label.
+        Cached until the next update.
+        """
+        with self._lock:
+            if self._summary is None:
+                clusters = []
+                for c in sorted(range(len(self.labels)), key=lambda c: self.labels[c]):
+                    count = len(self.members[c])
+                    if count == 0:
+                        continue
+                    means = self.sums[c] / count
+                    clusters.append({
+                        'cluster_label': self.labels[c],
+                        'members': [self.players[i] for i in self.members[c]],
+                        'averages': {col: round(float(m), 2) for col, m in zip(self.feature_cols, means)},
+                        'count': count,
+                    })
+                self._summary = clusters
+            return self._summary
+
+    def get_player(self, player: str):
+        """Returns the player's cluster and raw features, or None if unknown."""
+        with self._lock:
+            i = self.positions.get(player.lower())
+            if i is None:
+                return None
+            return self._get_player(i)
+
+    def _get_player(self, i: int):
+        c = int(self.assignments[i])
+        return {
+            'player': self.players[i],
+            'cluster': c,
+            'cluster_label': self.labels[c],
+            'features': dict(zip(self.feature_cols, self.raw[i].tolist())),
+        }
+
+    def to_frame(self):
+        """Current state in the same layout as the offline cluster CSVs."""
+        with self._lock:
+            df = pd.DataFrame({
+                'player': self.players,
+                'cluster': self.assignments,
+                'cluster_label': [self.labels[c] for c in self.assignments],
+            })
+            for col, values in zip(self.feature_cols, self.raw.T):
+                df[col] = values
+            return df
+
+    def save(self, path: str):
+        with self._lock:
+            save_npz_atomic(
+                path,
+                feature_cols=np.array(self.feature_cols),
+                players=np.array(self.players),
+                raw=self.raw,
+                assignments=self.assignments,
+                labels=np.array(self.labels),
+                mean=self.mean,
+                std=self.std,
+                centroids=self.centroids,
+                seen=self.seen,
+            )
+
+    @classmethod
+    def load(cls, path: str):
+        data = np.load(path)
+        model = cls.__new__(cls)
+        model.feature_cols = data['feature_cols'].tolist()
+        model.players = data['players'].tolist()
+        model.positions = {name.lower(): i for i, name in enumerate(model.players)}
+        model.raw = data['raw'].copy()
+        model.assignments = data['assignments'].copy()
+        model.labels = data['labels'].tolist()
+        model.mean = data['mean'].copy()
+        model.std = data['std'].copy()
+        model.centroids = data['centroids'].copy()
+        model.seen = data['seen'].copy()
+        model._rebuild_aggregates()
+        model._lock = threading.Lock()
+        return model
+
+
+def load_cluster_model(csv_path: str, snapshot_path: str, feature_cols):
+    """
+    Restores the latest snapshot if it is newer than the offline CSV,
+    otherwise fits centroids from the CSV.
+    """
+    if os.path.exists(snapshot_path) and os.path.getmtime(snapshot_path) >= os.path.getmtime(csv_path):
+        try:
+            return OnlineClusterModel.load(snapshot_path)
+        except Exception as e:
+            print(f"Warning: Could not load cluster snapshot {snapshot_path}: {e}")
+    df = pd.read_csv(csv_path)
+    df.columns = [c.strip() for c in df.columns]
+    return OnlineClusterModel(df, feature_cols)
+
+
+def benchmark(model: OnlineClusterModel, updates: int = 1000):
+    """
+    Times a full re-cluster, updates of existing players and additions of new
+    players on a copy of model. 'recluster_moved' is the share of players the
+    re-cluster gives a different label.
+    """
+    model = OnlineClusterModel(model.to_frame(), model.feature_cols)
+    players = len(model.players)
+    reclustered = OnlineClusterModel(model.to_frame(), model.feature_cols)
+    start = time.perf_counter()
+    result = reclustered.recluster()
+    recluster_ms = (time.perf_counter() - start) * 1000
+
+    rng = np.random.default_rng(0)
+    existing = rng.integers(0, players, updates)
+    rows = model.raw[existing] * rng.normal(1.0, 0.05, (updates, len(model.feature_cols)))
+    start = time.perf_counter()
+    for i, values in zip(existing, rows):
+        model.update(model.players[i], dict(zip(model.feature_cols, values)))
+    update_existing_us = (time.perf_counter() - start) / updates * 1e6
+
+    start = time.perf_counter()
+    for n, values in enumerate(rows):
+        model.update(f'benchmark player {n}', dict(zip(model.feature_cols, values)))
+    update_new_us = (time.perf_counter() - start) / updates * 1e6
+
+    start = time.perf_counter()
+    model.summary()
+    summary_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        'players': players,
+        'update_existing_us': round(update_existing_us, 3),
+        'update_new_us': round(update_new_us, 3),
+        'summary_ms': round(summary_ms, 3),
+        'recluster_ms': round(recluster_ms, 3),
+        'recluster_iterations': result['iterations'],
+        'recluster_moved': result['moved'],
+    }
+
+
+if __name__ == '__main__':
+    batters = pd.read_csv(os.path.join(DATA_DIR, 'batter_clusters.csv'))
+    bowlers = pd.read_csv(os.path.join(DATA_DIR, 'bowler_clusters.csv'))
+    batter_model = OnlineClusterModel(batters, BATTER_FEATURES)
+    bowler_model = OnlineClusterModel(bowlers, BOWLER_FEATURES)
+    print('batters:', benchmark(batter_model), 'agreement:', round(batter_model.agreement(), 4))
+    print('bowlers:', benchmark(bowler_model), 'agreement:', round(bowler_model.agreement(), 4))
+
+    # Full re-cluster of every player, batters and bowlers together
+    start = time.perf_counter()
+    batter_model.recluster()
+    bowler_model.recluster()
+    print('all players:', {
+        'players': len(batter_model.players) + len(bowler_model.players),
+        'recluster_ms': round((time.perf_counter() - start) * 1000, 3),
+    })
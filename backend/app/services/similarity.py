@@ -0,0 +1,162 @@
+import time
+import numpy as np
+import pandas as pd
+
+# Largest K served by the prebuilt neighbour table
+MAX_NEIGHBOURS = 25
+
+
+class SimilarityIndex:
+    """
+    Nearest-neighbour lookup over standardized player feature vectors.
+
+    The full pairwise distance matrix is computed once when the index is built
+    and reduced to a table of the MAX_NEIGHBOURS closest players per row, so a
+    request is a dictionary lookup plus a slice.
+    Args:
+        df (pd.DataFrame): One row per player, must contain a 'player' column
+        feature_cols (list): Numeric columns used as the feature vector
+        max_neighbours (int): Number of neighbours kept per player
+    """
+
+    def __init__(self, df: pd.DataFrame, feature_cols, max_neighbours: int = MAX_NEIGHBOURS):
+        self.feature_cols = list(feature_cols)
+        self.players = df['player'].astype(str).tolist()
+        self.labels = df['cluster_label'].astype(str).tolist() if 'cluster_label' in df.columns else None
+        self._positions = {name.lower(): i for i, name in enumerate(self.players)}
+
+        X = df[self.feature_cols].to_numpy(dtype=np.float64)
+        # Standardize so that no single stat dominates the distance
+        std = X.std(axis=0)
+        std[std == 0] = 1.0
+        self.vectors = (X - X.mean(axis=0)) / std
+
+        self.max_neighbours = min(max_neighbours, len(self.players) - 1)
+        self.neighbours, self.distances = self._build_neighbour_table()
+
+    def _build_neighbour_table(self):
+        n = len(self.players)
+        if self.max_neighbours <= 0:
+            return np.empty((n, 0), dtype=np.int64), np.empty((n, 0))
+        # Squared euclidean distances for all pairs in one vectorized pass
+        sq_norms = np.einsum('ij,ij->i', self.vectors, self.vectors)
+        dist = sq_norms[:, None] + sq_norms[None, :] - 2.0 * self.vectors @ self.vectors.T
+        np.maximum(dist, 0, out=dist)
+        np.fill_diagonal(dist, np.inf)
+
+        k = self.max_neighbours
+        idx = np.argpartition(dist, k - 1, axis=1)[:, :k]
+        part = np.take_along_axis(dist, idx, axis=1)
+        order = np.argsort(part, axis=1, kind='stable')
+        neighbours = np.take_along_axis(idx, order, axis=1)
+        distances = np.sqrt(np.take_along_axis(part, order, axis=1))
+        return neighbours, distances
+
+    def __contains__(self, player: str):
+        return player.lower() in self._positions
+
+    def _entry(self, j: int, distance: float):
+        entry = {
+            'player': self.players[j],
+            'distance': round(float(distance), 4),
+            'similarity': round(1.0 / (1.0 + float(distance)), 4),
+        }
+        if self.labels is not None:
+            entry['cluster_label'] = self.labels[j]
+        return entry
+
+    def query(self, player: str, k: int = 5):
+        """
+        Returns the canonical player name and the k most similar players.
+        Raises KeyError if the player is not in the index.
+        """
+        i = self._positions[player.lower()]
+        k = max(0, min(k, self.max_neighbours))
+        similar = [
+            self._entry(j, d)
+            for j, d in zip(self.neighbours[i, :k], self.distances[i, :k])
+        ]
+        return self.players[i], similar
+
+    def all_pairs(self, k: int = 5):
+        """
+        Bulk top-k export for every player in the index, used for replacement suggestions.
+        """
+        k = max(0, min(k, self.max_neighbours))
+        return [
+            {
+                'player': self.players[i],
+                'similar': [
+                    self._entry(j, d)
+                    for j, d in zip(self.neighbours[i, :k], self.distances[i, :k])
+                ],
+            }
+            for i in range(len(self.players))
+        ]
+
+
+def build_batter_index(batter_df: pd.DataFrame, stats_df: pd.DataFrame = None):
+    """
+    Builds the batter index from batter_clusters.csv data, optionally joined with
+    career totals from batter_stats.csv.
+    """
+    feature_cols = ['strike_rate', '4s', '6s']
+    df = batter_df
+    if stats_df is not None:
+        stats = stats_df[['batter', 'total_runs', 'total_matches']].rename(
+            columns={'batter': 'player'}
+        )
+        df = batter_df.merge(stats, on='player', how='left')
+        df[['total_runs', 'total_matches']] = df[['total_runs', 'total_matches']].fillna(0)
+        feature_cols = feature_cols + ['total_runs', 'total_matches']
+    return SimilarityIndex(df, feature_cols)
+
+
+def build_bowler_index(bowler_df: pd.DataFrame):
+    return SimilarityIndex(bowler_df, ['economy', 'wickets'])
+
+
+def benchmark(index: SimilarityIndex, k: int = 5, repeats: int = 1000):
+    """
+    Times index construction, single-player queries and the all-pairs export.
+    """
+    df = pd.DataFrame({'player': index.players})
+    for c, col in enumerate(index.feature_cols):
+        df[col] = index.vectors[:, c]
+
+    start = time.perf_counter()
+    SimilarityIndex(df, index.feature_cols, index.max_neighbours)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    names = [index.players[i % len(index.players)] for i in range(repeats)]
+    start = time.perf_counter()
+    for name in names:
+        index.query(name, k)
+    query_us = (time.perf_counter() - start) / repeats * 1e6
+
+    start = time.perf_counter()
+    index.all_pairs(k)
+    all_pairs_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        'players': len(index.players),
+        'features': len(index.feature_cols),
+        'build_ms': round(build_ms, 3),
+        'query_us': round(query_us, 3),
+        'all_pairs_ms': round(all_pairs_ms, 3),
+    }
+
+
+if __name__ == '__main__':
+    import os
+
+    DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+    batters = pd.read_csv(os.path.join(DATA_DIR, 'batter_clusters.csv'))
+    bowlers = pd.read_csv(os.path.join(DATA_DIR, 'bowler_clusters.csv'))
+    stats = pd.read_csv(os.path.join(DATA_DIR, 'batter_stats.csv'))
+    for df in (batters, bowlers, stats):
+        df.columns = [c.strip() for c in df.columns]
+
+    print('batters:', benchmark(build_batter_index(batters)))
+    print('batters + stats:', benchmark(build_batter_index(batters, stats)))
+    print('bowlers:', benchmark(build_bowler_index(bowlers)))
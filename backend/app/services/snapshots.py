@@ -0,0 +1,23 @@
+import os
+import tempfile
+import numpy as np
+
+
+def save_npz_atomic(path: str, **arrays):
+    """
+    Writes arrays to path as .npz via a temporary file in the same directory
+    and os.replace, so a crash mid-write never leaves a truncated snapshot.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.snapshot-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, **arrays)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise